@@ -9,12 +9,13 @@ com exemplos numericos concretos.
 import sys
 from pathlib import Path
 
-# Adiciona a raiz do projeto ao path
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+# Adiciona a raiz do projeto ao path (uma unica vez, mesmo se importado de novo)
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 import numpy as np
-import matplotlib.pyplot as plt
+from utils import color
 
 def hsv_passo_a_passo(r, g, b, nome_cor=""):
     """
@@ -157,7 +158,14 @@ def main():
             obs = "Região azul"
             
         print(f"{nome:15} | ({r:3},{g:3},{b:3}) | ({h:3},{s:3},{v:3}) | {hue_real:5.0f}° | {obs}")
-    
+
+    # Validacao: a versao vetorizada (inteira) deve chegar nos mesmos valores
+    pixels = np.array([[(r, g, b) for _, r, g, b, *_ in resultados]], dtype=np.uint8)
+    hsv_vetorizado = color.rgb_para_hsv_uint8(pixels)[0]
+    esperado = np.array([(h, s, v) for *_, h, s, v in resultados])
+    divergencias = np.abs(hsv_vetorizado.astype(int) - esperado).max()
+    print(f"\n🔍 Versao vetorizada (utils.color): diferenca maxima = {divergencias}")
+
     print("\n💡 CONCEITOS-CHAVE PARA LEMBRAR:")
     print("• A roda HSV tem 6 setores de 60° cada")
     print("• O +2 e +4 são offsets para posicionar nos setores corretos") 
@@ -6,16 +6,41 @@ Este script demonstra EXATAMENTE como funciona o processo de 3 etapas:
 RGB -> Linear RGB -> XYZ -> Lab
 """
 
+import contextlib
+import functools
+import io
 import sys
 from pathlib import Path
 
-# Adiciona a raiz do projeto ao path
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+# Adiciona a raiz do projeto ao path (uma unica vez, mesmo se importado de novo)
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 import numpy as np
-import matplotlib.pyplot as plt
+from cv_lib import processamento
+from cv_lib.espacos_cor.lab import _remover_gamma_srgb, _xyz_para_lab_componente
+from utils import color
 
+def imprimir_em_bloco(funcao):
+    """
+    Acumula todos os print() da funcao em memoria e escreve tudo de uma vez.
+
+    A explicacao passo a passo faz dezenas de print() por cor; escrever um
+    unico bloco evita uma escrita (e um flush) no terminal para cada linha.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        saida = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(saida):
+                return funcao(*args, **kwargs)
+        finally:
+            # Escreve mesmo se a funcao falhar, para nao perder a explicacao
+            sys.stdout.write(saida.getvalue())
+    return envoltorio
+
+@imprimir_em_bloco
 def lab_passo_a_passo(r, g, b, nome_cor=""):
     """
     Demonstra o algoritmo RGB->Lab passo a passo com explicacoes detalhadas.
@@ -35,11 +60,12 @@ def lab_passo_a_passo(r, g, b, nome_cor=""):
     
     def gamma_reversa(c, nome_canal=""):
         print(f"   {nome_canal}: {c:.3f}", end="")
+        # O valor vem da mesma funcao usada por cv_lib.rgb_para_lab (e
+        # compilada por utils.color.rgb_para_lab_numba)
+        linear = _remover_gamma_srgb(c)
         if c <= 0.04045:
-            linear = c / 12.92
             print(f" <= 0.04045, então divide por 12.92 = {linear:.6f}")
         else:
-            linear = pow((c + 0.055) / 1.055, 2.4)
             print(f" > 0.04045, então ((c+0.055)/1.055)^2.4 = {linear:.6f}")
         return linear
     
@@ -103,11 +129,10 @@ def lab_passo_a_passo(r, g, b, nome_cor=""):
     
     def xyz_para_lab_func(t, nome=""):
         print(f"   {nome}: {t:.6f}", end="")
+        resultado = _xyz_para_lab_componente(t)
         if t > 0.008856:
-            resultado = pow(t, 1/3)
             print(f" > 0.008856, então t^(1/3) = {resultado:.6f}")
         else:
-            resultado = (7.787 * t + 16/116)
             print(f" <= 0.008856, então 7.787*t + 16/116 = {resultado:.6f}")
         return resultado
     
@@ -174,10 +199,19 @@ def main():
         (128, 64, 192, "Cor Intermediária"),   # Exemplo complexo
     ]
     
-    resultados = []
-    for r, g, b, nome in cores_teste:
-        L, a, b_final = lab_passo_a_passo(r, g, b, nome)
-        resultados.append((nome, r, g, b, L, a, b_final))
+    # Explicacao detalhada (com todos os prints) para uma cor ilustrativa
+    r_demo, g_demo, b_demo, nome_demo = cores_teste[-1]
+    lab_demo = lab_passo_a_passo(r_demo, g_demo, b_demo, nome_demo)
+    
+    # A tabela so precisa dos valores finais: todas as cores em uma unica
+    # chamada, sem repetir a explicacao para cada uma. Os valores vem da
+    # versao didatica (cv_lib, float64), a mesma conta do passo a passo; a
+    # versao vetorizada (float32) pode diferir em 1 unidade e e comparada
+    # depois da tabela
+    pixels = np.array([[(r, g, b) for r, g, b, _ in cores_teste]], dtype=np.uint8)
+    lab_cores = processamento.rgb_para_lab(pixels)[0]
+    resultados = [(nome, r, g, b, *map(int, lab))
+                  for (r, g, b, nome), lab in zip(cores_teste, lab_cores)]
     
     # Tabela resumo
     print("\n" + "="*90)
@@ -196,6 +230,27 @@ def main():
         
         print(f"{nome:18} | ({r:3},{g:3},{b:3}) | ({L:3},{a:3},{b_final:3}) | {interpretacao}")
     
+    # Validacao: o passo a passo deve chegar no mesmo valor da tabela (cv_lib)
+    divergencias = np.abs(lab_cores[-1].astype(int) - np.array(lab_demo)).max()
+    print(f"\n🔍 {nome_demo}: passo a passo x cv_lib.rgb_para_lab, "
+          f"diferenca maxima = {divergencias}")
+    
+    # As implementacoes de utils.color contra a referencia pixel a pixel do
+    # cv_lib, nas mesmas cores da tabela
+    lab_referencia = lab_cores[np.newaxis].astype(int)
+    for nome_funcao in ('rgb_para_lab_vetorizado', 'rgb_para_lab_numba',
+                        'rgb_para_lab_rapido'):
+        lab_funcao = getattr(color, nome_funcao)(pixels)
+        diferenca = np.abs(lab_funcao.astype(int) - lab_referencia).max()
+        print(f"🔍 {nome_funcao} x cv_lib.rgb_para_lab: diferenca maxima = {diferenca}")
+    
+    # Volta Lab -> RGB: o cv_lib recebe o Lab em float (em uint8 as
+    # subtracoes "- 128" estouram)
+    lab_imagem = lab_cores[np.newaxis]  # de volta ao shape (1, n_cores, 3)
+    rgb_referencia = processamento.lab_para_rgb(lab_imagem.astype(np.float64)).astype(int)
+    diferenca = np.abs(color.lab_para_rgb_vetorizado(lab_imagem).astype(int) - rgb_referencia).max()
+    print(f"🔍 lab_para_rgb_vetorizado x cv_lib.lab_para_rgb: diferenca maxima = {diferenca}")
+    
     print("\n💡 CONCEITOS-CHAVE PARA ENTENDER:")
     print("• Gamma correction: monitores não são lineares, precisamos reverter")
     print("• XYZ: espaço 'device-independent' baseado na visão humana")
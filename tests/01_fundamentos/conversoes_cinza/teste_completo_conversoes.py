@@ -9,14 +9,14 @@ com visualizacao organizada e analise comparativa dos resultados.
 import sys
 from pathlib import Path
 
-# Adiciona a raiz do projeto ao path
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+# Adiciona a raiz do projeto ao path (uma unica vez, mesmo se importado de novo)
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 import numpy as np
-import matplotlib.pyplot as plt
 from cv_lib import processamento
-from utils import visualization, datasets
+from utils import visualization, datasets, color
 
 def main():
     """Funcao principal do teste."""
@@ -48,17 +48,36 @@ def main():
     print("\n📊 Analise Quantitativa dos Resultados:")
     print("-" * 50)
     
-    resultados = {}
+    # Estatisticas impressas tipo a tipo: cada resultado da cv_lib e
+    # descartado logo depois, exceto os tipos salvos no final. A verificacao
+    # cruzada guarda so a diferenca maxima de cada tipo
+    tipos_salvos = ['luminancia', 'bt709', 'desaturacao']
+    salvos = {}
+    diferencas = {}
     for tipo in tipos_conversao:
         try:
             resultado = processamento.rgb_para_cinza(imagem_rgb, tipo=tipo)
-            resultados[tipo] = resultado
             
             print(f"{tipo:12} | min: {resultado.min():3d} | max: {resultado.max():3d} | "
                   f"media: {resultado.mean():6.2f} | std: {resultado.std():6.2f}")
                   
         except Exception as e:
             print(f"{tipo:12} | ERRO: {e}")
+            continue
+        
+        if tipo in tipos_salvos:
+            salvos[tipo] = resultado
+        vetorizado = color.rgb_para_cinza_vetorizado(imagem_rgb, tipo=tipo)
+        diferencas[tipo] = np.abs(np.subtract(resultado, vetorizado, dtype=np.int16)).max()
+    
+    # Verificacao cruzada: a versao vetorizada (utils.color) deve dar o mesmo
+    # resultado; diferencas acima de 1 (arredondamento) indicam um problema
+    # em uma das duas implementacoes
+    if diferencas:
+        print("\n🔍 Verificacao cruzada com utils.color.rgb_para_cinza_vetorizado:")
+        for tipo, diferenca in diferencas.items():
+            aviso = "" if diferenca <= 1 else "  ⚠️  divergencia"
+            print(f"{tipo:12} | diferenca maxima: {diferenca:3d}{aviso}")
     
     # Comparacao com implementacao do scikit-image (se disponivel)
     try:
@@ -66,7 +85,7 @@ def main():
         sk_resultado = (rgb2gray(imagem_rgb) * 255).astype(np.uint8)
         
         print("\n🔍 Comparacao com scikit-image:")
-        luminancia_resultado = resultados.get('luminancia')
+        luminancia_resultado = salvos.get('luminancia')
         if luminancia_resultado is not None:
             diferenca = np.abs(luminancia_resultado.astype(float) - sk_resultado.astype(float))
             print(f"Diferenca media com scikit-image: {diferenca.mean():.2f}")
@@ -86,10 +105,10 @@ def main():
     results_dir = project_root / "assets" / "results"
     results_dir.mkdir(exist_ok=True)
     
-    for tipo in ['luminancia', 'bt709', 'desaturacao']:
-        if tipo in resultados:
+    for tipo in tipos_salvos:
+        if tipo in salvos:
             caminho = results_dir / f"conversao_{tipo}_chelsea.png"
-            visualization.salvar_resultado(resultados[tipo], caminho)
+            visualization.salvar_resultado(salvos[tipo], caminho)
     
     print("\n🎉 Teste concluido com sucesso!")
     print("\n💡 Observacoes importantes:")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Verifica o caminho em lote de visualization.mostrar_grid_conversoes.
+
+Quando a funcao de conversao tem o atributo 'batch' (como
+color.rgb_para_cinza_vetorizado), a grade faz todas as conversoes em uma
+unica chamada. Este teste confere, sem abrir janelas (backend Agg), que os
+paineis mostram exatamente o resultado de color.rgb_para_cinza_lote e que,
+se o lote falhar, a grade volta a converter tipo a tipo.
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona a raiz do projeto ao path (uma unica vez, mesmo se importado de novo)
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import matplotlib
+matplotlib.use('Agg')  # apenas verifica os paineis, sem mostrar a figura
+import matplotlib.pyplot as plt
+import numpy as np
+from utils import visualization, color
+
+def paineis_da_grade(imagem_rgb, funcao_conversao, tipos):
+    """Monta a grade e devolve (titulo, dados) de cada painel de conversao."""
+    visualization.mostrar_grid_conversoes(imagem_rgb, funcao_conversao, tipos)
+    fig = plt.gcf()
+    paineis = [(ax.get_title(), ax.images[0].get_array() if ax.images else None)
+               for ax in fig.axes[1:len(tipos) + 1]]
+    plt.close(fig)
+    return paineis
+
+def main():
+    """Funcao principal do teste."""
+    print("🧪 Teste: grade de conversoes pelo caminho em lote")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(0)
+    imagem_rgb = rng.integers(0, 256, (32, 48, 3), dtype=np.uint8)
+    tipos = ['luminancia', 'bt709', 'media', 'desaturacao', 'canal_r']
+    esperado = color.rgb_para_cinza_lote(imagem_rgb, tipos)
+    
+    # 1. Com 'batch': cada painel e uma linha do lote
+    chamadas = []
+    def lote_contado(imagem, tipos_lote):
+        chamadas.append(tipos_lote)
+        return color.rgb_para_cinza_lote(imagem, tipos_lote)
+    def conversao(imagem, tipo='luminancia'):
+        raise AssertionError("com 'batch' a conversao tipo a tipo nao deve ser usada")
+    conversao.batch = lote_contado
+    
+    paineis = paineis_da_grade(imagem_rgb, conversao, tipos)
+    ok_lote = (len(chamadas) == 1 and
+               all(titulo == tipo and np.array_equal(dados, linha)
+                   for (titulo, dados), tipo, linha in zip(paineis, tipos, esperado)))
+    print(f"{'✅' if ok_lote else '❌'} Uma chamada ao lote, paineis iguais a rgb_para_cinza_lote")
+    
+    # 2. Lote que falha: volta para a conversao tipo a tipo
+    def lote_com_erro(imagem, tipos_lote):
+        raise RuntimeError("lote indisponivel")
+    def conversao_tipo_a_tipo(imagem, tipo='luminancia'):
+        return color.rgb_para_cinza_vetorizado(imagem, tipo=tipo)
+    conversao_tipo_a_tipo.batch = lote_com_erro
+    
+    paineis = paineis_da_grade(imagem_rgb, conversao_tipo_a_tipo, tipos)
+    ok_fallback = all(titulo == tipo and
+                      np.array_equal(dados, conversao_tipo_a_tipo(imagem_rgb, tipo=tipo))
+                      for (titulo, dados), tipo in zip(paineis, tipos))
+    print(f"{'✅' if ok_fallback else '❌'} Lote com erro: paineis convertidos tipo a tipo")
+    
+    if ok_lote and ok_fallback:
+        print("\n🎉 Caminho em lote verificado!")
+    else:
+        print("\n⚠️  Diferenca no caminho em lote")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -9,24 +9,25 @@ gama, normalizacao e operacoes entre imagens.
 import sys
 from pathlib import Path
 
-# Adiciona a raiz do projeto ao path
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.insert(0, str(project_root))
+# Adiciona a raiz do projeto ao path (uma unica vez, mesmo se importado de novo)
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 import numpy as np
-import matplotlib.pyplot as plt
 from cv_lib import processamento
 from utils import visualization, datasets
 
-def teste_brilho_contraste():
+def carregar_cinza(nome):
+    """Carrega uma imagem de teste garantindo escala de cinza."""
+    imagem = datasets.carregar_imagem_teste(nome)
+    return processamento.rgb_para_cinza(imagem) if len(imagem.shape) == 3 else imagem
+
+def teste_brilho_contraste(imagem_cinza):
     """Testa ajustes de brilho e contraste."""
     print("🔆 Testando Brilho e Contraste")
     print("-" * 40)
     
-    # Carrega imagem em escala de cinza
-    imagem_rgb = datasets.carregar_imagem_teste('camera')
-    imagem_cinza = processamento.rgb_para_cinza(imagem_rgb) if len(imagem_rgb.shape) == 3 else imagem_rgb
-    
     # Diferentes combinacoes de brilho e contraste
     transformacoes = [
         (0, 1.0, "Original"),
@@ -50,7 +51,8 @@ def teste_brilho_contraste():
         titulos.append(titulo)
         print(f"  {titulo}: min={resultado.min()}, max={resultado.max()}, media={resultado.mean():.1f}")
     
-    # Visualiza resultados
+    # Visualiza resultados (matplotlib so e importado quando vai plotar)
+    import matplotlib.pyplot as plt
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     axes = axes.flatten()
     
@@ -64,15 +66,11 @@ def teste_brilho_contraste():
     plt.show()
     
 
-def teste_correcao_gama():
+def teste_correcao_gama(imagem_cinza):
     """Testa correcao gama."""
     print("\n⚡ Testando Correcao Gama")
     print("-" * 40)
     
-    # Carrega imagem
-    imagem_rgb = datasets.carregar_imagem_teste('coins')
-    imagem_cinza = processamento.rgb_para_cinza(imagem_rgb) if len(imagem_rgb.shape) == 3 else imagem_rgb
-    
     # Diferentes valores de gama
     valores_gama = [0.5, 0.8, 1.0, 1.5, 2.0, 3.0]
     
@@ -91,7 +89,8 @@ def teste_correcao_gama():
         titulos.append(titulo)
         print(f"  γ={gama}: min={resultado.min()}, max={resultado.max()}, media={resultado.mean():.1f}")
     
-    # Visualiza resultados
+    # Visualiza resultados (matplotlib so e importado quando vai plotar)
+    import matplotlib.pyplot as plt
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     axes = axes.flatten()
     
@@ -105,18 +104,18 @@ def teste_correcao_gama():
     plt.show()
 
 
-def teste_normalizacao():
+def teste_normalizacao(imagem_original):
     """Testa normalizacao de imagens."""
     print("\n📊 Testando Normalizacao")
     print("-" * 40)
     
-    # Cria uma imagem com faixa dinamica limitada (simula imagem escura)
-    imagem_original = datasets.carregar_imagem_teste('camera')
-    if len(imagem_original.shape) == 3:
-        imagem_original = processamento.rgb_para_cinza(imagem_original)
-    
-    # Simula imagem com baixo contraste (valores entre 80-120)
-    imagem_baixo_contraste = np.clip(imagem_original * 0.2 + 80, 0, 255).astype(np.uint8)
+    # Simula imagem com baixo contraste (valores entre 80-131)
+    # Um unico buffer float32 e reaproveitado (out=) em cada etapa, sem criar
+    # um array temporario novo para a multiplicacao, a soma e o clip
+    temporario = np.multiply(imagem_original, 0.2, dtype=np.float32)
+    np.add(temporario, 80, out=temporario)
+    np.clip(temporario, 0, 255, out=temporario)
+    imagem_baixo_contraste = temporario.astype(np.uint8)
     
     # Aplica normalizacao
     imagem_normalizada = processamento.normalizar_imagem(imagem_baixo_contraste)
@@ -128,6 +127,7 @@ def teste_normalizacao():
         print(f"  {titulo}: min={img.min()}, max={img.max()}, media={img.mean():.1f}")
     
     # Visualiza com histogramas
+    import matplotlib.pyplot as plt
     fig, axes = plt.subplots(2, 3, figsize=(15, 8))
     
     for i, (img, titulo) in enumerate(zip(imagens, titulos)):
@@ -148,21 +148,11 @@ def teste_normalizacao():
     plt.show()
 
 
-def teste_operacoes_entre_imagens():
+def teste_operacoes_entre_imagens(img1, img2):
     """Testa operacoes aritmeticas entre imagens."""
     print("\n🔢 Testando Operacoes Entre Imagens")
     print("-" * 40)
     
-    # Carrega duas imagens diferentes
-    img1 = datasets.carregar_imagem_teste('camera')
-    img2 = datasets.carregar_imagem_teste('coins')
-    
-    # Converte para escala de cinza e redimensiona para mesmo tamanho
-    if len(img1.shape) == 3:
-        img1 = processamento.rgb_para_cinza(img1)
-    if len(img2.shape) == 3:
-        img2 = processamento.rgb_para_cinza(img2)
-    
     # Redimensiona img2 para o tamanho de img1 (metodo simples)
     if img1.shape != img2.shape:
         # Usa slicing para fazer um crop simples
@@ -192,7 +182,8 @@ def teste_operacoes_entre_imagens():
         except Exception as e:
             print(f"  Erro em {titulo}: {e}")
     
-    # Visualiza resultados
+    # Visualiza resultados (matplotlib so e importado quando vai plotar)
+    import matplotlib.pyplot as plt
     n_imagens = len(imagens)
     cols = 3
     rows = (n_imagens + cols - 1) // cols
@@ -221,11 +212,15 @@ def main():
     print("🧪 Teste Completo: Operacoes Pontuais")
     print("=" * 50)
     
+    # Carrega e converte as imagens uma unica vez para todos os testes
+    camera_cinza = carregar_cinza('camera')
+    coins_cinza = carregar_cinza('coins')
+    
     # Executa todos os testes
-    teste_brilho_contraste()
-    teste_correcao_gama() 
-    teste_normalizacao()
-    teste_operacoes_entre_imagens()
+    teste_brilho_contraste(camera_cinza)
+    teste_correcao_gama(coins_cinza)
+    teste_normalizacao(camera_cinza)
+    teste_operacoes_entre_imagens(camera_cinza, coins_cinza)
     
     print("\n🎉 Todos os testes de operacoes pontuais concluidos!")
     print("\n💡 Conceitos importantes:")
@@ -8,5 +8,6 @@ Contem funcoes auxiliares para visualizacao, metricas e manipulacao de dados.
 
 from . import visualization
 from . import datasets
+from . import color
 
-__all__ = ['visualization', 'datasets']
\ No newline at end of file
+__all__ = ['visualization', 'datasets', 'color']
\ No newline at end of file
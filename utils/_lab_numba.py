@@ -0,0 +1,37 @@
+# utils/_lab_numba.py
+
+"""
+Laco RGB -> Lab compilado com numba (usado por color.rgb_para_lab_numba).
+
+Fica em um modulo separado para que o numba so seja importado (e o laco so
+seja compilado) na primeira chamada de rgb_para_lab_numba, e nao em todo
+`import utils`. As funcoes escalares compiladas sao as da versao didatica
+(cv_lib.espacos_cor.lab), as mesmas que o exemplo passo a passo chama em
+Python puro.
+"""
+
+from numba import njit, prange
+
+from cv_lib.espacos_cor.lab import _remover_gamma_srgb, _xyz_para_lab_componente
+
+_srgb_para_linear = njit(cache=True)(_remover_gamma_srgb)
+_funcao_lab = njit(cache=True)(_xyz_para_lab_componente)
+
+
+@njit(cache=True, parallel=True)
+def rgb_para_lab_laco(imagem_rgb, matriz, white_point, saida):
+    """Laco pixel a pixel da versao didatica; as linhas rodam em paralelo."""
+    altura, largura = imagem_rgb.shape[0], imagem_rgb.shape[1]
+    for y in prange(altura):
+        for x in range(largura):
+            r = _srgb_para_linear(imagem_rgb[y, x, 0] / 255.0)
+            g = _srgb_para_linear(imagem_rgb[y, x, 1] / 255.0)
+            b = _srgb_para_linear(imagem_rgb[y, x, 2] / 255.0)
+
+            fx = _funcao_lab((r * matriz[0, 0] + g * matriz[0, 1] + b * matriz[0, 2]) / white_point[0])
+            fy = _funcao_lab((r * matriz[1, 0] + g * matriz[1, 1] + b * matriz[1, 2]) / white_point[1])
+            fz = _funcao_lab((r * matriz[2, 0] + g * matriz[2, 1] + b * matriz[2, 2]) / white_point[2])
+
+            saida[y, x, 0] = (116 * fy - 16) * 255 / 100
+            saida[y, x, 1] = 500 * (fx - fy) + 128
+            saida[y, x, 2] = 200 * (fy - fz) + 128
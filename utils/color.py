@@ -0,0 +1,392 @@
+# utils/color.py
+
+"""
+Conversoes de cor vetorizadas (NumPy) para uso em scripts e testes.
+
+As implementacoes em cv_lib/ sao didaticas (pixel a pixel). Aqui ficam as
+versoes vetorizadas equivalentes, usadas quando o objetivo e processar
+imagens inteiras rapidamente ou validar os resultados das versoes manuais.
+"""
+
+import importlib.util
+
+import numpy as np
+from cv_lib.espacos_cor.lab import (obter_matriz_srgb_para_xyz, obter_white_point_d65,
+                                   _remover_gamma_srgb)
+
+# Numba e OpenCV sao opcionais e importados so quando usados (em
+# rgb_para_lab_numba e rgb_para_lab_rapido): `import utils` nao os carrega
+NUMBA_DISPONIVEL = importlib.util.find_spec('numba') is not None
+
+
+def _validar_rgb_uint8(imagem_rgb):
+    """
+    Garante a entrada das conversoes deste modulo: uint8 (altura, largura, 3).
+
+    Mais restrita que cv_lib.utils.validacao.validar_imagem_rgb, que tambem
+    aceita imagens 2D e float: aqui as tabelas e a aritmetica inteira
+    dependem de pixels uint8.
+    """
+    if imagem_rgb.dtype != np.uint8 or imagem_rgb.ndim != 3 or imagem_rgb.shape[2] != 3:
+        raise ValueError("imagem_rgb deve ser uint8 com shape (altura, largura, 3), "
+                         f"mas e {imagem_rgb.dtype} {imagem_rgb.shape}")
+
+
+def rgb_para_hsv_uint8(imagem_rgb):
+    """
+    Converte RGB uint8 para HSV uint8 usando apenas aritmetica inteira.
+
+    Especializada para a entrada mais comum (altura, largura, 3) uint8 e
+    produz o mesmo formato de cv_lib.espacos_cor.rgb_para_hsv:
+    H em [0-179], S e V em [0-255].
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+
+    Returns:
+        numpy.ndarray: Imagem HSV shape (altura, largura, 3) dtype uint8
+
+    Ideia:
+        - V = max(R,G,B) ja e o valor final, sem normalizar para [0,1]
+        - S = delta*255 // max (divisao inteira no lugar de ponto flutuante)
+        - H/2 = 30*(posicao + offset), escolhido por mascara em vez de if/elif
+
+    Nota: pode diferir em 1 unidade da versao em ponto flutuante, que as
+    vezes trunca valores como 65.9999... para 65. A divisao inteira e exata.
+    """
+    _validar_rgb_uint8(imagem_rgb)
+
+    # int32 evita overflow em 30*(g-b) e delta*255
+    rgb = imagem_rgb.astype(np.int32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+    max_val = np.maximum(np.maximum(r, g), b)
+    min_val = np.minimum(np.minimum(r, g), b)
+    delta = max_val - min_val
+
+    # Evita divisao por zero: onde delta/max sao 0 o resultado e descartado
+    delta_seguro = np.where(delta == 0, 1, delta)
+    max_seguro = np.where(max_val == 0, 1, max_val)
+
+    # SATURATION: delta/max em [0-255]
+    s = np.where(max_val == 0, 0, (delta * 255) // max_seguro)
+
+    # HUE: mesma prioridade do if/elif da versao didatica (R, depois G, depois B)
+    h_r = ((30 * (g - b)) // delta_seguro) % 180
+    h_g = (30 * (b - r)) // delta_seguro + 60
+    h_b = (30 * (r - g)) // delta_seguro + 120
+    h = np.where(max_val == r, h_r, np.where(max_val == g, h_g, h_b))
+    h = np.where(delta == 0, 0, h)
+
+    return np.stack([h, s, max_val], axis=-1).astype(np.uint8)
+
+
+# =============================================================================
+# RGB -> Lab vetorizado
+# =============================================================================
+
+# Constantes compartilhadas com a versao didatica (cv_lib.espacos_cor.lab)
+MATRIZ_SRGB_PARA_XYZ = obter_matriz_srgb_para_xyz().astype(np.float32)
+MATRIZ_XYZ_PARA_SRGB = np.linalg.inv(obter_matriz_srgb_para_xyz()).astype(np.float32)
+WHITE_POINT_D65 = np.array(obter_white_point_d65(), dtype=np.float32)
+
+# Com os pixels em linhas (N, 3), X = R*m00 + G*m01 + B*m02 vira pixels @ M.T.
+# As transpostas ficam prontas (e contiguas) para nao refazer isso a cada chamada.
+_SRGB_PARA_XYZ_T = np.ascontiguousarray(MATRIZ_SRGB_PARA_XYZ.T)
+_XYZ_PARA_SRGB_T = np.ascontiguousarray(MATRIZ_XYZ_PARA_SRGB.T)
+
+
+def _criar_lut_srgb_para_linear():
+    """
+    Tabela com o valor linear de cada um dos 256 niveis sRGB possiveis.
+
+    Como a entrada e uint8, a curva de gamma so precisa ser avaliada 256
+    vezes (pela mesma funcao da versao didatica); depois cada pixel vira uma
+    simples consulta: LUT[valor].
+    """
+    linear = [_remover_gamma_srgb(valor / 255.0) for valor in range(256)]
+    return np.array(linear, dtype=np.float32)
+
+
+# Criada uma unica vez na importacao e compartilhada por todos os scripts
+LUT_SRGB_PARA_LINEAR = _criar_lut_srgb_para_linear()
+
+
+# Tamanho alvo (em bytes de float32) de cada bloco de linhas processado por
+# rgb_para_lab_vetorizado: pequeno o suficiente para os arrays intermediarios
+# de um bloco caberem no cache L2 em vez de irem e voltarem da memoria
+BYTES_POR_BLOCO = 256 * 1024
+
+
+def rgb_para_lab_vetorizado(imagem_rgb, linhas_por_bloco=None):
+    """
+    Converte RGB uint8 para Lab uint8 sem lacos por pixel.
+
+    Mesmo algoritmo de cv_lib.espacos_cor.rgb_para_lab (e de
+    lab_passo_a_passo), mas cada etapa e uma operacao NumPy sobre varios
+    pixels em vez de um laco Python por pixel.
+
+    A imagem e processada em blocos de linhas: todas as etapas rodam sobre
+    um bloco antes de passar ao proximo, entao os resultados intermediarios
+    (linear, XYZ, f(t)) ainda estao no cache quando a etapa seguinte os le.
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+        linhas_por_bloco: Linhas por bloco (None = calculado a partir de
+            BYTES_POR_BLOCO e da largura da imagem)
+
+    Returns:
+        numpy.ndarray: Imagem Lab shape (altura, largura, 3) dtype uint8
+        (L em [0-255], a e b deslocados de +128)
+
+    Nota: os calculos sao feitos em float32, entao valores que caem muito
+    perto de um inteiro (ex: a=127.9999 no branco) podem truncar para 1
+    unidade de diferenca da versao didatica em float64.
+    """
+    _validar_rgb_uint8(imagem_rgb)
+
+    altura, largura = imagem_rgb.shape[:2]
+    if linhas_por_bloco is None:
+        # max(1, largura): imagens de largura 0 nao dividem por zero
+        linhas_por_bloco = max(1, BYTES_POR_BLOCO // (max(1, largura) * 3 * 4))
+
+    imagem_lab = np.empty_like(imagem_rgb)
+    for y0 in range(0, altura, linhas_por_bloco):
+        bloco = imagem_rgb[y0:y0 + linhas_por_bloco]
+        imagem_lab[y0:y0 + linhas_por_bloco] = _rgb_para_lab_bloco(bloco)
+
+    return imagem_lab
+
+
+def _rgb_para_lab_bloco(bloco_rgb):
+    """Pipeline RGB -> Lab completo para um bloco de linhas."""
+    # ETAPA 1: sRGB -> Linear RGB (remove gamma) via tabela de 256 entradas
+    linear = LUT_SRGB_PARA_LINEAR[bloco_rgb]
+
+    # ETAPA 2: Linear RGB -> XYZ (uma multiplicacao de matrizes para todos os pixels)
+    xyz = linear.reshape(-1, 3) @ _SRGB_PARA_XYZ_T
+
+    # ETAPA 2.5: Normalizacao pelo white point D65 (broadcast)
+    t = xyz / WHITE_POINT_D65
+
+    # ETAPA 3: XYZ -> Lab
+    # np.cbrt ja e vetorizado (SIMD) no NumPy; trocar por uma tabela de 16384
+    # entradas sobre t foi medido mais lento (consulta ~4x, com interpolacao
+    # linear ~17x), entao a raiz cubica continua sendo calculada diretamente.
+    # np.where calcularia os dois ramos para todos os valores; em vez disso a
+    # raiz cubica e calculada para todos e so os poucos valores do ramo linear
+    # (t <= 0.008856, tons muito escuros) sao corrigidos depois
+    f = np.cbrt(t)
+    escuros = t <= 0.008856
+    if escuros.any():
+        f[escuros] = 7.787 * t[escuros] + 16 / 116
+    fx, fy, fz = f[:, 0], f[:, 1], f[:, 2]
+
+    L = 116 * fy - 16
+    a = 500 * (fx - fy)
+    b = 200 * (fy - fz)
+
+    # ETAPA 4: Ranges uint8 convencionais
+    lab = np.stack([L * 255 / 100, a + 128, b + 128], axis=-1)
+    lab = np.clip(lab, 0, 255).astype(np.uint8)
+
+    return lab.reshape(bloco_rgb.shape)
+
+
+def lab_para_rgb_vetorizado(imagem_lab):
+    """
+    Converte Lab uint8 (formato de rgb_para_lab_vetorizado) de volta para RGB.
+
+    Inverso de rgb_para_lab_vetorizado, no mesmo formato de
+    cv_lib.espacos_cor.lab_para_rgb.
+
+    Args:
+        imagem_lab: Array shape (altura, largura, 3)
+
+    Returns:
+        numpy.ndarray: Imagem RGB shape (altura, largura, 3) dtype uint8
+    """
+    if imagem_lab.ndim != 3 or imagem_lab.shape[2] != 3:
+        raise ValueError("imagem_lab deve ter shape (altura, largura, 3), "
+                         f"mas tem {imagem_lab.shape}")
+
+    lab = imagem_lab.reshape(-1, 3).astype(np.float32)
+    L = lab[:, 0] * 100 / 255
+    a = lab[:, 1] - 128
+    b = lab[:, 2] - 128
+
+    # ETAPA 1: Lab -> XYZ (funcoes inversas + white point D65)
+    fy = (L + 16) / 116
+    f = np.stack([a / 500 + fy, fy, fy - b / 200], axis=-1)
+    f3 = f ** 3
+    xyz = np.where(f3 > 0.008856, f3, (f - 16 / 116) / 7.787) * WHITE_POINT_D65
+
+    # ETAPA 2: XYZ -> Linear RGB (matriz inversa)
+    linear = np.maximum(xyz @ _XYZ_PARA_SRGB_T, 0)
+
+    # ETAPA 3: Linear RGB -> sRGB (aplica gamma)
+    # Sem tabela inversa (LINEAR_TO_SRGB): o valor linear e continuo, entao a
+    # tabela precisaria quantiza-lo. Com 65536 entradas a etapa sozinha fica
+    # ~2x mais rapida, mas a conversao inteira nao mudou alem do ruido
+    # (predominam a etapa 1 e a matriz) e ~0.2% dos valores mudavam 1 nivel.
+    # Como na raiz cubica de _rgb_para_lab_bloco, so os valores do ramo
+    # linear sao recalculados
+    srgb = 1.055 * np.power(linear, 1 / 2.4) - 0.055
+    escuros = linear <= 0.0031308
+    if escuros.any():
+        srgb[escuros] = 12.92 * linear[escuros]
+
+    rgb = np.clip(srgb * 255, 0, 255).astype(np.uint8)
+    return rgb.reshape(imagem_lab.shape)
+
+
+def rgb_para_lab_numba(imagem_rgb):
+    """
+    Converte RGB uint8 para Lab uint8 compilando o laco pixel a pixel com numba.
+
+    Compila as mesmas funcoes escalares de cv_lib.espacos_cor.lab
+    (_remover_gamma_srgb, _xyz_para_lab_componente) usadas pela versao
+    didatica e pelo exemplo passo a passo, em float64 como
+    cv_lib.espacos_cor.rgb_para_lab.
+    O numba so e importado, e o laco compilado (ou lido do cache em
+    __pycache__), na primeira chamada. Sem numba instalado, delega para
+    rgb_para_lab_vetorizado.
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+
+    Returns:
+        numpy.ndarray: Imagem Lab shape (altura, largura, 3) dtype uint8
+    """
+    if not NUMBA_DISPONIVEL:
+        return rgb_para_lab_vetorizado(imagem_rgb)
+
+    _validar_rgb_uint8(imagem_rgb)
+
+    from ._lab_numba import rgb_para_lab_laco
+
+    saida = np.empty(imagem_rgb.shape, dtype=np.float64)
+    rgb_para_lab_laco(imagem_rgb, obter_matriz_srgb_para_xyz(),
+                       np.array(obter_white_point_d65()), saida)
+    return np.clip(saida, 0, 255).astype(np.uint8)
+
+
+def rgb_para_lab_rapido(imagem_rgb):
+    """
+    Converte RGB uint8 para Lab uint8 pelo caminho mais rapido disponivel.
+
+    Com OpenCV instalado usa cv2.cvtColor (mesmo formato uint8: L*255/100,
+    a+128, b+128); sem ele, usa rgb_para_lab_vetorizado. O
+    skimage.color.rgb2lab nao entra na cadeia: calcula tudo em float64 e foi
+    medido ~3x mais lento que a versao vetorizada em uma imagem 1920x1080.
+
+    Serve para processar imagens inteiras; para entender o algoritmo, use
+    lab_passo_a_passo ou cv_lib.espacos_cor.rgb_para_lab.
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+
+    Returns:
+        numpy.ndarray: Imagem Lab shape (altura, largura, 3) dtype uint8
+
+    Nota: o resultado depende de o OpenCV estar instalado. O cvtColor usa
+    tabelas e aritmetica de ponto fixo proprias e arredonda em vez de
+    truncar: em uma imagem aleatoria 500x500, ~54% dos valores diferiram
+    dos de rgb_para_lab_vetorizado, em ate 3 unidades.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return rgb_para_lab_vetorizado(imagem_rgb)
+
+    _validar_rgb_uint8(imagem_rgb)
+    # cvtColor recusa imagens vazias; a versao vetorizada devolve um Lab vazio
+    if imagem_rgb.size == 0:
+        return np.empty_like(imagem_rgb)
+
+    return cv2.cvtColor(imagem_rgb, cv2.COLOR_RGB2LAB)
+
+
+# =============================================================================
+# RGB -> Cinza em lote
+# =============================================================================
+
+# Conversoes lineares de cv_lib.espacos_cor.rgb_para_cinza: pesos (R, G, B) e
+# divisor. 'media' usa (1, 1, 1)/3 para somar inteiros exatos antes de dividir,
+# como (r + g + b) / 3 na versao didatica.
+PESOS_CINZA = {
+    'luminancia': ((0.299, 0.587, 0.114), 1),
+    'bt601': ((0.299, 0.587, 0.114), 1),
+    'bt709': ((0.2126, 0.7152, 0.0722), 1),
+    'media': ((1, 1, 1), 3),
+    'canal_r': ((1, 0, 0), 1),
+    'canal_g': ((0, 1, 0), 1),
+    'canal_b': ((0, 0, 1), 1),
+}
+
+
+def rgb_para_cinza_lote(imagem_rgb, tipos):
+    """
+    Aplica varias conversoes RGB -> cinza de uma vez.
+
+    Todas as conversoes lineares viram linhas de uma matriz de pesos (N, 3),
+    entao uma unica multiplicacao pesos @ pixels calcula todas elas em uma
+    so passada pela imagem. 'desaturacao' ((max + min) / 2) nao e linear e
+    e calculada a parte.
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+        tipos: Lista de tipos aceitos por cv_lib.espacos_cor.rgb_para_cinza
+
+    Returns:
+        numpy.ndarray: Shape (len(tipos), altura, largura) dtype uint8, na
+        mesma ordem de tipos
+
+    Nota: a ordem das somas na multiplicacao de matrizes pode diferir da
+    versao pixel a pixel, entao valores que caem exatamente num inteiro
+    podem truncar para 1 unidade de diferenca.
+    """
+    _validar_rgb_uint8(imagem_rgb)
+
+    tipos_invalidos = [t for t in tipos if t not in PESOS_CINZA and t != 'desaturacao']
+    if tipos_invalidos:
+        raise ValueError(f"Tipo(s) {tipos_invalidos} nao reconhecido(s). Tipos validos: "
+                         f"{list(PESOS_CINZA) + ['desaturacao']}")
+
+    altura, largura = imagem_rgb.shape[:2]
+    pixels = imagem_rgb.reshape(-1, 3).astype(np.float64)
+    resultado = np.empty((len(tipos), altura * largura), dtype=np.float64)
+
+    lineares = [i for i, t in enumerate(tipos) if t in PESOS_CINZA]
+    if lineares:
+        pesos = np.array([PESOS_CINZA[tipos[i]][0] for i in lineares])
+        divisores = np.array([PESOS_CINZA[tipos[i]][1] for i in lineares], dtype=np.float64)
+        resultado[lineares] = (pesos @ pixels.T) / divisores[:, None]
+
+    for i, tipo in enumerate(tipos):
+        if tipo == 'desaturacao':
+            resultado[i] = (pixels.max(axis=1) + pixels.min(axis=1)) / 2
+
+    resultado = np.clip(resultado, 0, 255).astype(np.uint8)
+    return resultado.reshape(len(tipos), altura, largura)
+
+
+def rgb_para_cinza_vetorizado(imagem_rgb, tipo='luminancia'):
+    """
+    Uma conversao RGB -> cinza pela versao vetorizada (rgb_para_cinza_lote).
+
+    Tem a mesma assinatura de cv_lib.processamento.rgb_para_cinza e o
+    atributo 'batch', entao visualization.mostrar_grid_conversoes converte
+    todos os tipos em uma unica chamada a rgb_para_cinza_lote.
+
+    Args:
+        imagem_rgb: Array uint8 shape (altura, largura, 3)
+        tipo: Tipo de conversao (ver rgb_para_cinza_lote)
+
+    Returns:
+        numpy.ndarray: Imagem em cinza shape (altura, largura) dtype uint8
+    """
+    return rgb_para_cinza_lote(imagem_rgb, [tipo])[0]
+
+
+rgb_para_cinza_vetorizado.batch = rgb_para_cinza_lote
@@ -6,6 +6,8 @@ Centralizacao do acesso a datasets padrao e imagens customizadas.
 """
 
 import os
+import re
+import functools
 import numpy as np
 from skimage import data, io
 from pathlib import Path
@@ -14,6 +16,28 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 ASSETS_PATH = PROJECT_ROOT / "assets" / "test_images"
 
+# Funcoes de carregamento (ainda nao executadas) para cada imagem padrao
+_CARREGADORES = {
+    'chelsea': data.chelsea,            # Gato colorido
+    'camera': data.camera,              # Cameraman (P&B clasica)
+    'coins': data.coins,                # Moedas (boa para segmentacao)
+    'astronaut': data.astronaut,        # Astronauta colorido
+    'coffee': data.coffee,              # Xicard de cafe
+    'rocket': data.rocket,              # Foguete (alta resolucao)
+    'checkerboard': data.checkerboard   # Tabuleiro (padroes geometricos)
+}
+
+# Apenas os nomes: consultar quais imagens existem nao decodifica nenhuma
+LISTA_IMAGENS_PADRAO = tuple(_CARREGADORES)
+
+# Extensoes aceitas para imagens customizadas (maiusculas ou minusculas)
+_EXTENSOES_IMAGEM = re.compile(r'\.(jpe?g|png|bmp|tiff)$', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=None)
+def _carregar_cacheado(nome):
+    """Decodifica a imagem apenas na primeira vez que ela e pedida."""
+    return _CARREGADORES[nome]()
+
 def carregar_imagens_padrao():
     """
     Carrega conjunto de imagens padrao do scikit-image para testes.
@@ -21,16 +45,8 @@ def carregar_imagens_padrao():
     Returns:
         dict: Dicionario com nome -> imagem
     """
-    imagens = {
-        'chelsea': data.chelsea(),      # Gato colorido
-        'camera': data.camera(),        # Cameraman (P&B clasica)
-        'coins': data.coins(),          # Moedas (boa para segmentacao)
-        'astronaut': data.astronaut(),  # Astronauta colorido
-        'coffee': data.coffee(),        # Xicard de cafe
-        'rocket': data.rocket(),        # Foguete (alta resolucao)
-        'checkerboard': data.checkerboard()  # Tabuleiro (padroes geometricos)
-    }
-    return imagens
+    # Copias: quem recebe pode modificar a imagem sem alterar o cache
+    return {nome: _carregar_cacheado(nome).copy() for nome in LISTA_IMAGENS_PADRAO}
 
 def carregar_imagem_teste(nome='chelsea'):
     """
@@ -42,15 +58,13 @@ def carregar_imagem_teste(nome='chelsea'):
     Returns:
         numpy.ndarray: Imagem carregada
     """
-    imagens = carregar_imagens_padrao()
-    
-    if nome not in imagens:
+    if nome not in _CARREGADORES:
         print(f"⚠️  Imagem '{nome}' nao encontrada. Opcoes disponiveis:")
-        for key in imagens.keys():
+        for key in LISTA_IMAGENS_PADRAO:
             print(f"   - {key}")
-        return imagens['chelsea']  # Padrao
+        nome = 'chelsea'  # Padrao
     
-    return imagens[nome]
+    return _carregar_cacheado(nome).copy()
 
 def listar_imagens_customizadas():
     """
@@ -62,12 +76,9 @@ def listar_imagens_customizadas():
     if not ASSETS_PATH.exists():
         return []
     
-    extensoes = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
-    imagens = []
-    
-    for ext in extensoes:
-        imagens.extend(ASSETS_PATH.glob(f"*{ext}"))
-        imagens.extend(ASSETS_PATH.glob(f"*{ext.upper()}"))
+    # Uma unica leitura do diretorio, filtrando pela extensao
+    imagens = [caminho for caminho in ASSETS_PATH.iterdir()
+               if _EXTENSOES_IMAGEM.search(caminho.name)]
     
     return sorted(imagens)
 
@@ -146,29 +157,31 @@ def criar_imagem_teste(tipo='gradiente', tamanho=(200, 200)):
     h, w = tamanho
     
     if tipo == 'gradiente':
-        # Gradiente horizontal
-        imagem = np.linspace(0, 255, w, dtype=np.uint8)
-        imagem = np.tile(imagem, (h, 1))
+        # Gradiente horizontal: uma linha repetida em todas as alturas.
+        # broadcast_to cria a "repeticao" sem copiar; o .copy() final faz a
+        # unica alocacao (h, w) e devolve um array que pode ser modificado
+        linha = np.linspace(0, 255, w, dtype=np.uint8)
+        imagem = np.broadcast_to(linha, (h, w)).copy()
         
     elif tipo == 'xadrez':
-        # Padrao xadrez
-        imagem = np.zeros((h, w), dtype=np.uint8)
+        # Padrao xadrez: branco onde (linha_do_quadrado + coluna_do_quadrado) e par,
+        # ou seja, onde as paridades da linha e da coluna do quadrado sao iguais
         quadrado = 20
-        for i in range(0, h, quadrado):
-            for j in range(0, w, quadrado):
-                if ((i // quadrado) + (j // quadrado)) % 2 == 0:
-                    imagem[i:i+quadrado, j:j+quadrado] = 255
+        paridade_linha = (np.arange(h) // quadrado) % 2
+        paridade_coluna = (np.arange(w) // quadrado) % 2
+        mascara = np.equal.outer(paridade_linha, paridade_coluna)
+        imagem = np.where(mascara, np.uint8(255), np.uint8(0))
                     
     elif tipo == 'circulo':
         # Circulo branco em fundo preto
-        imagem = np.zeros((h, w), dtype=np.uint8)
         centro_y, centro_x = h // 2, w // 2
         raio = min(h, w) // 4
         
-        for y in range(h):
-            for x in range(w):
-                if (y - centro_y)**2 + (x - centro_x)**2 <= raio**2:
-                    imagem[y, x] = 255
+        # ogrid gera uma coluna de y e uma linha de x; o broadcast monta a
+        # mascara (altura, largura) sem laco Python
+        y, x = np.ogrid[:h, :w]
+        mascara = (y - centro_y)**2 + (x - centro_x)**2 <= raio**2
+        imagem = np.where(mascara, np.uint8(255), np.uint8(0))
                     
     elif tipo == 'ruido':
         # Ruido aleatorio
@@ -5,10 +5,171 @@ Funcoes utilitarias para visualizacao de imagens e resultados.
 Centralizacao de codigo comum de matplotlib para manter consistencia visual.
 """
 
-import matplotlib.pyplot as plt
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from pathlib import Path
 
-def mostrar_comparacao(imagens, titulos, figsize=(15, 5), cmap_list=None):
+# matplotlib.pyplot e importado dentro de cada funcao: quem usa apenas
+# utils.datasets ou utils.color nao paga o custo de carregar o matplotlib
+
+# Tabelas (256, 4) uint8 de cada colormap ja usado, criadas uma unica vez
+_LUTS_COLORMAP = {}
+
+def _lut_colormap(nome_cmap):
+    """Cores RGBA uint8 dos 256 niveis de um colormap (cacheada por nome)."""
+    if nome_cmap not in _LUTS_COLORMAP:
+        import matplotlib
+        cmap = matplotlib.colormaps[nome_cmap].resampled(256)
+        _LUTS_COLORMAP[nome_cmap] = cmap(np.arange(256), bytes=True)
+    return _LUTS_COLORMAP[nome_cmap]
+
+def _aplicar_colormap_uint8(imagem, nome_cmap='gray', limites=None):
+    """
+    Converte uma imagem 2D em RGBA uint8 aplicando o colormap por tabela.
+    
+    Faz o mesmo que o imshow com cmap (escala entre o min e o max da
+    imagem), mas sem passar a imagem inteira para float64: cada pixel vira
+    uma consulta na tabela do colormap.
+    
+    Args:
+        imagem: Array 2D (uint8, bool ou float sem NaN/inf)
+        nome_cmap: Nome do colormap do matplotlib
+        limites: (min, max) da escala; None = min e max da propria imagem
+        
+    Returns:
+        numpy.ndarray: Imagem RGBA shape (altura, largura, 4) dtype uint8
+    """
+    lut = _lut_colormap(nome_cmap)
+    if imagem.dtype == np.bool_:
+        imagem = imagem.view(np.uint8)  # mascaras: False/True -> 0/1
+    if imagem.dtype == np.uint8:
+        # A escala min/max e aplicada so nos 256 valores possiveis, e a
+        # imagem e indexada uma unica vez pela tabela combinada
+        return lut[_niveis_uint8(imagem, limites)][imagem]
+    return lut[_indices_colormap(imagem, limites)]
+
+def _niveis_uint8(imagem, limites=None):
+    """Indice do colormap (0-255) de cada um dos 256 valores uint8 possiveis."""
+    minimo, maximo = limites if limites is not None else (imagem.min(), imagem.max())
+    escala = 256 / (float(maximo) - float(minimo)) if maximo > minimo else 0.0
+    return np.clip((np.arange(256) - float(minimo)) * escala, 0, 255).astype(np.uint8)
+
+def _indices_colormap(imagem, limites=None):
+    """
+    Indice do colormap (0-255) de cada pixel de uma imagem 2D, com a mesma
+    escala entre min e max que o imshow usa (ou entre os limites dados).
+    """
+    if imagem.dtype == np.bool_:
+        imagem = imagem.view(np.uint8)  # mascaras: False/True -> 0/1
+    if imagem.dtype == np.uint8:
+        return _niveis_uint8(imagem, limites)[imagem]
+    
+    minimo, maximo = limites if limites is not None else (imagem.min(), imagem.max())
+    escala = 256 / (float(maximo) - float(minimo)) if maximo > minimo else 0.0
+    # Subtrai em float64: em int8/int16 (imagem - minimo) estouraria o tipo
+    diferenca = np.subtract(imagem, float(minimo), dtype=np.float64)
+    return np.clip(diferenca * escala, 0, 255).astype(np.uint8)
+
+def _exibir_figura(fig):
+    """
+    Mostra a figura sem esperar quando nao e preciso.
+    
+    - Agg (sem tela, ex: servidor sem DISPLAY, onde o matplotlib ja cai no
+      Agg sozinho): nao ha janela, entao plt.show() nao e chamado.
+    - Janela interativa (Tk, Qt...) em modo interativo (plt.ion(), IPython):
+      so agenda o redesenho e processa eventos por 1 ms, sem bloquear.
+    - Demais casos (script comum, Jupyter inline): plt.show() como antes;
+      em um script, retornar sem bloquear fecharia as janelas ao terminar.
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+    
+    if matplotlib.get_backend().lower() == 'agg':
+        return
+    
+    if fig.canvas.required_interactive_framework and plt.isinteractive():
+        fig.canvas.draw_idle()
+        plt.pause(0.001)
+    else:
+        plt.show()
+
+def _tem_nao_finitos(imagem):
+    """
+    True para imagens float com NaN ou inf. Elas ficam no caminho normal do
+    imshow, que mascara esses pixels (cor "bad" do colormap) e os ignora no
+    min/max; a tabela uint8 nao tem como representa-los.
+    """
+    return imagem.dtype.kind == 'f' and not np.isfinite(imagem).all()
+
+def _preparar_para_imshow(imagem, limites=None):
+    """
+    Entrega a imagem ja em RGBA uint8 contiguo, o formato que o imshow
+    desenha direto, sem normalizar, aplicar colormap ou acrescentar o canal
+    alfa a cada desenho.
+    
+    - Cinza (2D): RGBA pelo colormap 'gray' (_aplicar_colormap_uint8)
+    - RGB float: recortada em [0, 1] (como o imshow faz) e levada a uint8
+    - RGB uint8: copiada uma unica vez para um array RGBA com alfa 255
+    - Outros casos (RGBA uint8, fatias nao contiguas...): apenas contiguo
+    - Float com NaN/inf: devolvida como esta (ver _tem_nao_finitos)
+    
+    limites: (min, max) da escala de cinza; None = min e max da imagem. Usado
+    quando a imagem foi reduzida, para manter a escala da imagem original
+    """
+    if _tem_nao_finitos(imagem):
+        return imagem
+    if imagem.ndim == 2:
+        return _aplicar_colormap_uint8(imagem, 'gray', limites)
+    if imagem.dtype.kind == 'f':
+        imagem = (np.clip(imagem, 0, 1) * 255).astype(np.uint8)
+    if imagem.dtype == np.uint8 and imagem.shape[2] == 3:
+        rgba = np.empty(imagem.shape[:2] + (4,), dtype=np.uint8)
+        rgba[..., :3] = imagem
+        rgba[..., 3] = 255
+        return rgba
+    return np.ascontiguousarray(imagem)
+
+def _reduzir_para_exibicao(imagem, largura_painel, altura_painel):
+    """
+    Reduz uma imagem muito maior que o painel onde sera mostrada.
+    
+    Se mesmo com metade da resolucao ainda sobram pelo menos 2 pixels da
+    imagem por pixel da tela, faz a media de blocos k x k (como a
+    interpolacao INTER_AREA do OpenCV, para fatores inteiros) mantendo 2
+    pixels por pixel da tela. Assim o imshow reamostra um array pequeno a
+    cada desenho em vez da imagem inteira. As bordas que nao completam um
+    bloco (menos de k pixels) sao descartadas. Imagens float com NaN/inf nao
+    sao reduzidas: a media espalharia cada NaN pelo bloco inteiro.
+    
+    Returns:
+        numpy.ndarray: A imagem reduzida, ou a propria imagem se ja for pequena
+    """
+    altura, largura = imagem.shape[:2]
+    k = int(max(altura / altura_painel, largura / largura_painel) / 2)
+    if k < 2 or _tem_nao_finitos(imagem):
+        return imagem
+    
+    altura_k, largura_k = altura // k, largura // k
+    blocos = imagem[:altura_k * k, :largura_k * k].reshape(
+        (altura_k, k, largura_k, k) + imagem.shape[2:])
+    reduzida = blocos.mean(axis=(1, 3))
+    if imagem.dtype.kind in 'uib':
+        reduzida = np.rint(reduzida)
+    return reduzida.astype(imagem.dtype)
+
+# Figuras de mostrar_comparacao por (n_imagens, figsize):
+# (fig, axes, artistas, titulos mostrados)
+_FIGURAS_COMPARACAO = {}
+
+def _esquecer_figura(chave, fig, evento=None):
+    """Remove do cache a figura fechada (se ela ainda for a da chave)."""
+    em_cache = _FIGURAS_COMPARACAO.get(chave)
+    if em_cache is not None and em_cache[0] is fig:
+        del _FIGURAS_COMPARACAO[chave]
+
+def mostrar_comparacao(imagens, titulos, figsize=(15, 5), cmap_list=None, fast=True):
     """
     Mostra multiplas imagens lado a lado para comparacao.
     
@@ -17,92 +178,342 @@ def mostrar_comparacao(imagens, titulos, figsize=(15, 5), cmap_list=None):
         titulos: Lista de strings (titulos)
         figsize: Tupla com tamanho da figura
         cmap_list: Lista de colormaps (None para RGB, 'gray' para cinza)
+        fast: Se True, imagens muito maiores que o painel sao reduzidas antes
+            do imshow (ver _reduzir_para_exibicao). False mostra a imagem em
+            resolucao total (ex: para inspecionar pixels com zoom)
     """
+    import matplotlib.pyplot as plt
+    
     n_imagens = len(imagens)
-    fig, axes = plt.subplots(1, n_imagens, figsize=figsize)
     
-    if n_imagens == 1:
-        axes = [axes]
+    # Figuras fechadas sem close_event (ex: plt.close no Agg) saem do cache aqui
+    for chave_antiga, (fig_antiga, *_) in list(_FIGURAS_COMPARACAO.items()):
+        if not plt.fignum_exists(fig_antiga.number):
+            del _FIGURAS_COMPARACAO[chave_antiga]
+    
+    # Reaproveita a figura da chamada anterior com o mesmo layout, se ela
+    # ainda estiver aberta: so os dados das imagens e os titulos mudam
+    chave = (n_imagens, tuple(figsize))
+    em_cache = _FIGURAS_COMPARACAO.get(chave)
+    if em_cache is not None and plt.fignum_exists(em_cache[0].number):
+        fig, axes, artistas, titulos_atuais = em_cache
+        # Volta a ser a figura atual, como uma figura nova seria: um
+        # plt.savefig logo depois grava esta comparacao, nao a ultima grade
+        plt.figure(fig.number)
+    else:
+        # layout='constrained' ajusta os espacos no proprio desenho, sem a
+        # passada extra do tight_layout medindo todos os textos a cada chamada
+        fig, axes = plt.subplots(1, n_imagens, figsize=figsize, layout='constrained')
+        if n_imagens == 1:
+            axes = [axes]
+        artistas = [None] * n_imagens
+        titulos_atuais = [None] * n_imagens
+        _FIGURAS_COMPARACAO[chave] = (fig, axes, artistas, titulos_atuais)
+        # Ao fechar a figura, solta a entrada (e as imagens que ela prende)
+        fig.canvas.mpl_connect('close_event',
+                               functools.partial(_esquecer_figura, chave, fig))
+    
+    # Tamanho aproximado de cada painel em pixels da tela
+    largura_painel = fig.get_figwidth() * fig.dpi / n_imagens
+    altura_painel = fig.get_figheight() * fig.dpi
     
     for i, (img, titulo) in enumerate(zip(imagens, titulos)):
-        cmap = 'gray' if cmap_list is None else cmap_list[i]
-        if len(img.shape) == 2:  # Imagem em escala de cinza
-            cmap = 'gray'
-            
-        axes[i].imshow(img, cmap=cmap)
-        axes[i].set_title(titulo, fontsize=12)
-        axes[i].axis('off')
+        cmap = 'gray' if cmap_list is None or img.ndim == 2 else cmap_list[i]
+        # O extent usa o tamanho original: as coordenadas dos eixos continuam
+        # sendo as da imagem original mesmo se ela for reduzida
+        altura, largura = img.shape[:2]
+        extent = (-0.5, largura - 0.5, altura - 0.5, -0.5)
+        limites = None
+        if fast:
+            reduzida = _reduzir_para_exibicao(img, largura_painel, altura_painel)
+            # A escala de cinza vem da imagem inteira: a media dos blocos
+            # apaga pixels extremos e esticaria o contraste do resto
+            if reduzida is not img and img.ndim == 2:
+                limites = (img.min(), img.max())
+            img = reduzida
+        img = _preparar_para_imshow(img, limites)
+        
+        if artistas[i] is None:
+            artistas[i] = axes[i].imshow(img, cmap=cmap, extent=extent)
+            axes[i].axis('off')
+        else:
+            artistas[i].set_data(img)
+            artistas[i].set_extent(extent)
+            # Cinza com NaN/inf chega cru: o clim precisa seguir os dados novos
+            artistas[i].set_cmap(cmap)
+            artistas[i].autoscale()
+        # set_title invalida o layout do texto: so chama se o titulo mudou
+        if titulos_atuais[i] != titulo:
+            axes[i].set_title(titulo, fontsize=12)
+            titulos_atuais[i] = titulo
+    
+    _exibir_figura(fig)
+
+class PainelComparacao:
+    """
+    Painel lado a lado para atualizar as mesmas imagens varias vezes
+    (ex: dentro de um laco que varia um parametro).
     
-    plt.tight_layout()
-    plt.show()
+    Usa blitting: o fundo de cada painel (eixos, titulo) e guardado uma vez
+    e, a cada atualizacao, so a imagem e redesenhada por cima dele, sem
+    redesenhar a figura inteira.
+    
+    Exemplo:
+        painel = PainelComparacao([original, resultado], ["Original", "Gama"])
+        for gama in valores:
+            painel.atualizar([original, processamento.correcao_gama(original, gama)])
+    
+    As imagens novas devem ter o mesmo shape das iniciais. As imagens ficam
+    fora do desenho normal da figura, entao nao aparecem em fig.savefig;
+    para gravar um resultado, use salvar_resultado.
+    """
+    
+    def __init__(self, imagens, titulos, figsize=(15, 5)):
+        import matplotlib
+        import matplotlib.pyplot as plt
+        
+        n_imagens = len(imagens)
+        self.fig, axes = plt.subplots(1, n_imagens, figsize=figsize, layout='constrained')
+        self.axes = [axes] if n_imagens == 1 else list(axes)
+        
+        # animated=True: as imagens ficam fora do desenho normal da figura,
+        # que passa a conter apenas o fundo
+        self.artistas = []
+        for ax, img, titulo in zip(self.axes, imagens, titulos):
+            img = _preparar_para_imshow(img)
+            self.artistas.append(ax.imshow(img, cmap='gray', animated=True))
+            ax.set_title(titulo, fontsize=12)
+            ax.axis('off')
+        
+        # Todo desenho completo (inclusive ao redimensionar a janela)
+        # recaptura os fundos
+        self.fundos = []
+        self.fig.canvas.mpl_connect('draw_event', self._capturar_fundos)
+        
+        if matplotlib.get_backend().lower() == 'agg':
+            self.fig.canvas.draw()
+        else:
+            plt.show(block=False)
+            plt.pause(0.001)
+    
+    def _capturar_fundos(self, evento=None):
+        """Guarda o fundo de cada painel e desenha as imagens por cima."""
+        canvas = self.fig.canvas
+        self.fundos = [canvas.copy_from_bbox(ax.bbox) for ax in self.axes]
+        for ax, artista in zip(self.axes, self.artistas):
+            ax.draw_artist(artista)
+    
+    def atualizar(self, imagens):
+        """
+        Troca as imagens do painel redesenhando apenas a area de cada imagem.
+        
+        Args:
+            imagens: Lista de arrays numpy, na mesma ordem e shape das iniciais
+        """
+        canvas = self.fig.canvas
+        for ax, artista, fundo, img in zip(self.axes, self.artistas, self.fundos, imagens):
+            artista.set_data(_preparar_para_imshow(img))
+            canvas.restore_region(fundo)
+            ax.draw_artist(artista)
+            canvas.blit(ax.bbox)
+        canvas.flush_events()
+
+def _validar_para_grid(resultado):
+    """
+    Levanta ValueError se o resultado nao puder ser desenhado pelo imshow:
+    precisa ser um array nao vazio 2D, ou 3D com 3 ou 4 canais.
+    """
+    if resultado.size == 0:
+        raise ValueError(f"Resultado vazio: shape {resultado.shape}")
+    if not (resultado.ndim == 2 or (resultado.ndim == 3 and resultado.shape[2] in (3, 4))):
+        raise ValueError(f"Shape invalido para exibicao: {resultado.shape}")
 
 def mostrar_grid_conversoes(imagem_rgb, funcao_conversao, tipos_conversao, 
-                           figsize=(16, 10)):
+                           figsize=(16, 10), paralelo=False):
     """
     Mostra grid comparativo de diferentes tipos de conversao aplicados a uma imagem.
     
     Args:
         imagem_rgb: Imagem original RGB
-        funcao_conversao: Funcao que aplica a conversao (ex: processamento.rgb_para_cinza)
+        funcao_conversao: Funcao que aplica a conversao (ex: processamento.rgb_para_cinza).
+            Se tiver um atributo 'batch' (funcao(imagem, tipos) -> array
+            (n_tipos, altura, largura), como color.rgb_para_cinza_lote),
+            todas as conversoes sao feitas em uma unica chamada. Sem 'batch',
+            os tipos sao convertidos um a um
         tipos_conversao: Lista de tipos de conversao a testar
         figsize: Tamanho da figura
+        paralelo: Se True (e sem 'batch'), converte os tipos em threads
+            paralelas; a funcao precisa poder ser chamada de varias threads
+            ao mesmo tempo. So compensa para funcoes que liberam o GIL (ex:
+            cv2.cvtColor, operacoes NumPy sobre a imagem inteira); os lacos
+            pixel a pixel do cv_lib seguram o GIL e nao ganham nada
     """
+    import matplotlib.pyplot as plt
+    
     n_tipos = len(tipos_conversao)
     cols = 4
-    rows = (n_tipos + cols) // cols  # Calcula numero de linhas necessarias
+    n_paineis = n_tipos + 1  # Original + uma conversao por tipo
+    rows = (n_paineis + cols - 1) // cols  # Calcula numero de linhas necessarias
     
-    fig, axes = plt.subplots(rows, cols, figsize=figsize)
-    axes = axes.flatten() if rows > 1 else [axes] if cols == 1 else axes
+    fig, axes = plt.subplots(rows, cols, figsize=figsize, layout='constrained')
+    # Sempre um array 1D de Axes, qualquer que seja o formato da grade
+    axes = np.atleast_1d(axes).ravel()
     
     # Mostra original
     axes[0].imshow(imagem_rgb)
     axes[0].set_title("Original RGB", fontweight='bold')
     axes[0].axis('off')
     
-    # Aplica cada conversao
-    for i, tipo in enumerate(tipos_conversao, 1):
+    # Fase 1 - calculo: todas as conversoes antes de desenhar qualquer painel.
+    # Cada item vira (resultado, (min, max), erro): com erro, os dois primeiros
+    # sao None. Conversao em lote, se a funcao oferecer; se falhar, converte
+    # tipo a tipo para que cada painel mostre o proprio erro
+    resultados = None
+    conversao_lote = getattr(funcao_conversao, 'batch', None)
+    if conversao_lote is not None and n_tipos > 0:
         try:
-            resultado = funcao_conversao(imagem_rgb, tipo=tipo)
-            axes[i].imshow(resultado, cmap='gray')
+            lote = np.asarray(conversao_lote(imagem_rgb, tipos_conversao))
+            if lote.ndim != 3 or lote.shape[0] != n_tipos or lote.size == 0:
+                raise ValueError(f"Lote com shape invalido: {lote.shape}")
+            # Um unico bloco (n_tipos, altura*largura): min e max de todas as
+            # conversoes em duas reducoes, sem um laco Python por imagem
+            planos = lote.reshape(n_tipos, -1)
+            resultados = [(resultado, (minimo, maximo), None) for resultado, minimo, maximo
+                          in zip(lote, planos.min(axis=1), planos.max(axis=1))]
+        except Exception:
+            resultados = None
+    
+    if resultados is None:
+        def converter(tipo):
+            # A validacao e o min/max ficam dentro do try: um resultado que o
+            # imshow nao consegue desenhar vira um painel de erro, nao uma
+            # excecao na fase de desenho
+            try:
+                resultado = np.asarray(funcao_conversao(imagem_rgb, tipo=tipo))
+                _validar_para_grid(resultado)
+                return resultado, (resultado.min(), resultado.max()), None
+            except Exception as e:
+                return None, None, e
+        
+        if paralelo:
+            # Threads so se sobrepoem enquanto a funcao estiver fora do GIL;
+            # o desenho continua todo na thread principal
+            n_threads = max(1, min(n_tipos, os.cpu_count() or 1))
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                resultados = list(executor.map(converter, tipos_conversao))
+        else:
+            resultados = [converter(tipo) for tipo in tipos_conversao]
+    
+    # Fase 2 - desenho: apenas matplotlib a partir daqui
+    for i, (tipo, (resultado, stats_tipo, erro)) in enumerate(
+            zip(tipos_conversao, resultados), 1):
+        if erro is None:
+            # O mesmo min/max serve para a escala de cores e para as estatisticas
+            minimo, maximo = stats_tipo
+            # vmin/vmax explicitos: o imshow nao refaz o min/max da imagem
+            axes[i].imshow(resultado, cmap='gray', vmin=minimo, vmax=maximo)
             axes[i].set_title(f"{tipo}", fontsize=10)
             axes[i].axis('off')
             
             # Adiciona estatisticas basicas
-            stats = f"min:{resultado.min()} max:{resultado.max()}"
+            stats = f"min:{minimo} max:{maximo}"
             axes[i].text(0.02, 0.98, stats, transform=axes[i].transAxes, 
                         fontsize=8, verticalalignment='top', 
                         bbox=dict(boxstyle='round', facecolor='white', alpha=0.7))
-        except Exception as e:
-            axes[i].text(0.5, 0.5, f"Erro:\n{str(e)}", 
+        else:
+            axes[i].text(0.5, 0.5, f"Erro:\n{str(erro)}", 
                         transform=axes[i].transAxes, ha='center', va='center',
                         fontsize=10, color='red')
             axes[i].set_title(f"{tipo} (ERRO)", color='red')
             axes[i].axis('off')
     
     # Esconde axes extras se houver
-    for i in range(n_tipos + 1, len(axes)):
+    for i in range(n_paineis, len(axes)):
         axes[i].axis('off')
     
-    plt.tight_layout()
-    plt.show()
+    _exibir_figura(fig)
 
-def salvar_resultado(imagem, caminho, dpi=150):
+def salvar_resultado(imagem, caminho, dpi=None, compress_level=1, cmap=None,
+                     tight=False):
     """
     Salva uma imagem nos resultados com configuracoes padronizadas.
     
+    Imagens uint8 (cinza ou RGB) ja estao prontas para exibicao e sao
+    gravadas direto pelo Pillow, pixel a pixel, sem montar uma figura do
+    matplotlib. Imagens cinza em outros tipos (float, int16...), ou com um
+    cmap pedido, sao normalizadas pelo min/max (como no imshow) e gravadas
+    com 1 byte por pixel: modo 'L' para cinza, ou modo 'P' (paleta com as
+    256 cores do colormap) para outros colormaps. Apenas imagens coloridas
+    que nao sao uint8 e imagens float com NaN/inf passam pelo matplotlib.
+    
     Args:
         imagem: Array numpy da imagem
         caminho: Caminho onde salvar (incluir extensao)
-        dpi: Resolucao da imagem salva
+        dpi: Resolucao da imagem salva (apenas no caminho do matplotlib).
+            None = calculado para a figura de 10 polegadas de largura sair
+            com a resolucao original da imagem, sem amplia-la so para
+            depois comprimir mais pixels
+        compress_level: Compressao do PNG, de 0 a 9. 1 (padrao) codifica
+            varias vezes mais rapido que o 6 do libpng, com arquivos um
+            pouco maiores; 9 = arquivo menor, mais lento
+        cmap: Colormap para imagens 2D (ex: 'viridis'). None grava imagens
+            uint8 como estao e normaliza as demais em cinza
+        tight: Se True, recorta a figura com bbox_inches='tight' (apenas no
+            caminho do matplotlib). Custa um desenho extra so para medir a
+            figura; como ela ja tem a proporcao da imagem e nao tem margens,
+            normalmente nao ha nada a recortar
     """
-    plt.figure(figsize=(10, 8))
+    if (imagem.ndim == 2 and (cmap is not None or imagem.dtype != np.uint8)
+            and not _tem_nao_finitos(imagem)):
+        from PIL import Image
+        
+        indices = _indices_colormap(imagem)
+        if cmap in (None, 'gray'):
+            # No colormap 'gray' R = G = B: basta um canal da tabela (modo 'L')
+            imagem_pil = Image.fromarray(_lut_colormap('gray')[:, 0][indices])
+        else:
+            # Modo 'P': o indice de cada pixel + a paleta com as 256 cores
+            imagem_pil = Image.fromarray(indices)
+            imagem_pil.putpalette(_lut_colormap(cmap)[:, :3].tobytes())
+            if Path(caminho).suffix.lower() in ('.jpg', '.jpeg'):
+                imagem_pil = imagem_pil.convert('RGB')  # JPEG nao tem paleta
+        imagem_pil.save(caminho, compress_level=compress_level)
+        print(f"✅ Resultado salvo em: {caminho}")
+        return
+    
+    if imagem.dtype == np.uint8 and (imagem.ndim == 2 or
+                                     (imagem.ndim == 3 and imagem.shape[2] in (3, 4))):
+        from PIL import Image
+        
+        # fromarray exige memoria contigua (fatias como img[:, ::2] nao sao)
+        imagem_pil = Image.fromarray(np.ascontiguousarray(imagem))
+        if imagem_pil.mode == 'RGBA' and Path(caminho).suffix.lower() in ('.jpg', '.jpeg'):
+            imagem_pil = imagem_pil.convert('RGB')  # JPEG nao tem canal alfa
+        imagem_pil.save(caminho, compress_level=compress_level)
+        print(f"✅ Resultado salvo em: {caminho}")
+        return
+    
+    # Figura avulsa com canvas Agg proprio: nao passa pelo pyplot (nenhuma
+    # janela, nenhum registro global de figuras, nada para fechar depois)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
     
-    if len(imagem.shape) == 2:  # Escala de cinza
-        plt.imshow(imagem, cmap='gray')
-    else:  # RGB
-        plt.imshow(imagem)
+    # Figura com 10 polegadas de largura e a mesma proporcao da imagem
+    altura, largura = imagem.shape[:2]
+    fig = Figure(figsize=(10, 10 * altura / largura))
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))  # a imagem ocupa a figura toda (sem margens)
+    # RGB nao uint8, ou cinza float com NaN/inf (pintados com a cor "bad")
+    ax.imshow(imagem, cmap=cmap or 'gray')
+    ax.axis('off')
     
-    plt.axis('off')
-    plt.savefig(caminho, dpi=dpi, bbox_inches='tight', pad_inches=0)
-    plt.close()
-    print(f"✅ Resultado salvo em: {caminho}")
\ No newline at end of file
+    if dpi is None:
+        dpi = largura / 10
+    # pil_kwargs so existe para formatos gravados pelo Pillow (nao PDF/SVG)
+    extras = {}
+    if Path(caminho).suffix.lower() == '.png':
+        extras['pil_kwargs'] = {'compress_level': compress_level, 'optimize': False}
+    if tight:
+        extras.update(bbox_inches='tight', pad_inches=0)
+    fig.savefig(caminho, dpi=dpi, facecolor=fig.get_facecolor(), **extras)
+    print(f"✅ Resultado salvo em: {caminho}")